@@ -5,277 +5,661 @@ import shutil
 import re
 import json
 import time
+import functools
+import collections
+import tempfile
+import types
+import signal
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QPushButton, QFileDialog, QComboBox, QProgressBar, 
                             QMessageBox, QGroupBox, QRadioButton, QListWidget, QCheckBox,
                             QMenu, QAction, QTextEdit, QDialog)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMimeData, QUrl
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMimeData, QUrl, QObject, QRunnable, QThreadPool
 from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QFont
 
+# Concurrent NVENC sessions allowed on consumer NVIDIA GPUs
+NVENC_MAX_SESSIONS = 2
+# Threads given to each libx264 encode when several run in parallel
+X264_THREADS_PER_JOB = 4
+# Standard x264 presets mapped to NVENC equivalents; quality saturates early
+# on NVENC, so the slower presets stop at p5 instead of p7
+NVENC_PRESETS = types.MappingProxyType({
+    "veryfast": "p1",   # Fastest/lowest quality
+    "medium": "p3",     # Balanced
+    "veryslow": "p5"    # Slowest/highest quality
+})
+# User-friendly preset names mapped to FFmpeg preset values
+UI_PRESETS = types.MappingProxyType({
+    "Fast (Low Quality)": "veryfast",
+    "Medium Quality": "medium",
+    "Slow (High Quality)": "veryslow"
+})
+# Audio codecs that each output container can take as-is (stream copy)
+AUDIO_COPY_CODECS = types.MappingProxyType({
+    "mp4": frozenset({"aac", "mp3"}),
+    "mov": frozenset({"aac", "mp3"}),
+    "mkv": frozenset({"aac", "mp3"}),
+    "avi": frozenset({"mp3"}),
+})
+# Output containers that take the input's subtitle tracks as-is (stream copy)
+SUBTITLE_COPY_FORMATS = frozenset({"mkv"})
+# Video information panel layout, filled from VideoInfoExtractor results
+INFO_HTML = (
+    "<b>File:</b> {filename}<br>"
+    "<b>Size:</b> {filesize}<br>"
+    "<b>Duration:</b> {duration}<br>"
+    "<b>Resolution:</b> {resolution}<br>"
+    "<b>Video Codec:</b> {video_codec}<br>"
+    "<b>Audio Codec:</b> {audio_codec}<br>"
+    "<b>Bitrate:</b> {bitrate}"
+)
+# File extensions accepted as video input
+VIDEO_EXTENSIONS = frozenset({".mp4", ".mkv", ".avi", ".mov", ".webm", ".flv", ".m4v", ".ts", ".wmv"})
+# Duration line printed by "ffmpeg -i"
+DURATION_RE = re.compile(rb"Duration: (\d{2}):(\d{2}):(\d{2}\.\d+)")
+# FFmpeg output fragments that point at an NVENC/driver problem
+NVENC_ERRORS = (b"NVENC", b"GPU", b"Error initializing", b"CUDA", b"can't initialize")
+# FFmpeg output fragments showing the input can't be decoded on the GPU
+CUDA_DECODE_ERRORS = (
+    b"No decoder", b"Impossible to convert between the formats",
+    b"Failed setup for format cuda", b"hwaccel initialisation returned error",
+)
+# Keys written by "-progress pipe:1"; these lines are kept out of the log
+PROGRESS_KEYS = frozenset({
+    b"frame", b"fps", b"bitrate", b"total_size", b"out_time_us", b"out_time_ms",
+    b"out_time", b"dup_frames", b"drop_frames", b"speed", b"progress",
+})
+# Per-stream "-progress" keys (e.g. stream_0_0_q) start with this prefix
+PROGRESS_STREAM_PREFIX = b"stream_"
+# Minimum time between progress updates from one conversion (4 Hz)
+PROGRESS_INTERVAL_NS = 250_000_000
+# Number of recent FFmpeg log lines kept in memory for error analysis
+LOG_TAIL_LINES = 256
+# Number of log lines shown in the log viewer; the rest stays on disk
+LOG_VIEW_LINES = 2000
+# Time cancelled FFmpeg processes share to exit cleanly before being killed
+CANCEL_TIMEOUT_MS = 1000
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_path():
+    """Resolve the FFmpeg executable on PATH once; None if it isn't installed"""
+    return shutil.which("ffmpeg")
+
+def _available_cpus():
+    """Number of CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+@functools.lru_cache(maxsize=256)
+def _probe_duration(path, mtime_ns, size):
+    """Probe the duration of a video in seconds (mtime_ns and size key the cache)"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path
+    ]
+    
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode == 0:
+        return float(result.stdout.strip())
+        
+    # Fallback method if ffprobe fails
+    cmd = [
+        _ffmpeg_path(),
+        "-i", path
+    ]
+    
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    # Parse the output to find duration
+    match = DURATION_RE.search(result.stderr)
+    if match:
+        h, m, s = match.groups()
+        return int(h) * 3600 + int(m) * 60 + float(s)
+        
+    return 0
+
+def _nvenc_cache_path():
+    """Location of the cached NVENC probe result"""
+    return os.path.join(os.path.expanduser("~"), ".cache", "video_converter", "nvenc.json")
+
+def _read_nvenc_cache(key):
+    """Return True if NVENC was previously confirmed for key, or None on a miss"""
+    if key is None:
+        return None
+    try:
+        with open(_nvenc_cache_path(), "r") as f:
+            cache = json.load(f)
+        # Only successes are trusted; a failure may have been transient
+        if cache.get("key") == key and cache.get("ok") is True:
+            return True
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+def _write_nvenc_cache(key):
+    """Record a working NVENC so later launches can skip the test encode"""
+    if key is None:
+        return
+    try:
+        cache_path = _nvenc_cache_path()
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump({"key": key, "ok": True}, f)
+    except OSError as e:
+        print(f"Could not write NVENC cache: {str(e)}")
+
+def _query_nvidia_gpu():
+    """Return "name, driver_version" of the first NVIDIA GPU, or None if there isn't one"""
+    # Query only the fields we need instead of the full nvidia-smi banner
+    try:
+        nvidia_result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=name,driver_version", "--format=csv,noheader", "-i", "0"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=2
+        )
+        if nvidia_result.returncode == 0:
+            gpu_info = nvidia_result.stdout.strip()
+            print(f"NVIDIA GPU: {gpu_info}")
+            return gpu_info
+    except Exception as e:
+        print(f"nvidia-smi not available: {str(e)}")
+    return None
+
+def _nvenc_cache_key(gpu_info):
+    """Build a key identifying the FFmpeg binary and NVIDIA GPU/driver in use"""
+    ffmpeg_path = _ffmpeg_path()
+    if not ffmpeg_path:
+        return None
+    return f"{ffmpeg_path}|{os.path.getmtime(ffmpeg_path)}|{gpu_info or ''}"
+
+def _is_nvenc_available():
+    """Check if NVENC hardware encoding is available"""
+    try:
+        print("Checking NVENC availability...")
+        
+        if _ffmpeg_path() is None:
+            print("FFmpeg not found, NVENC unavailable")
+            return False
+            
+        # The GPU name and driver version key the cached result
+        gpu_info = _query_nvidia_gpu()
+        
+        # Without an NVIDIA GPU there's nothing to test; FFmpeg builds often list
+        # h264_nvenc anyway, and failures aren't cached, so skip the test encode
+        if gpu_info is None:
+            print("No NVIDIA GPU found, NVENC unavailable")
+            return False
+            
+        # Reuse the previous probe result if FFmpeg and the driver are unchanged
+        cache_key = _nvenc_cache_key(gpu_info)
+        cached = _read_nvenc_cache(cache_key)
+        if cached is not None:
+            print(f"NVENC availability (cached): {cached}")
+            return cached
+        
+        # Method 1: Check if h264_nvenc encoder is listed
+        cmd = [
+            _ffmpeg_path(),
+            "-hide_banner",
+            "-encoders"
+        ]
+        
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=2)
+        has_nvenc_listed = "h264_nvenc" in result.stdout
+        
+        print(f"NVENC in encoders list: {has_nvenc_listed}")
+        
+        if not has_nvenc_listed:
+            print("NVENC encoder not found in FFmpeg encoders list")
+            return False
+            
+        # Method 2: Try a simple test encode with very strict parameters; only
+        # this catches GPUs without NVENC and drivers too old for this FFmpeg.
+        # A success is cached, so it normally runs once per FFmpeg/driver.
+        # This is designed to succeed even on older GPUs
+        test_cmd = [
+            _ffmpeg_path(),
+            "-hide_banner",
+            "-y",
+            "-f", "lavfi",
+            "-i", "color=c=black:s=32x32:r=1:d=1",
+            "-c:v", "h264_nvenc",
+            "-preset", NVENC_PRESETS["veryfast"], # fastest preset
+            "-profile:v", "baseline",
+            "-b:v", "250k",
+            "-f", "null",
+            "-"
+        ]
+        
+        print(f"Running NVENC test: {' '.join(test_cmd)}")
+        
+        test_result = subprocess.run(
+            test_cmd, 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.PIPE, 
+            text=True,
+            timeout=10
+        )
+        
+        test_success = test_result.returncode == 0
+        print(f"NVENC test result: {'Success' if test_success else 'Failed'}")
+        if not test_success:
+            print("NVENC test output:")
+            print(test_result.stderr)
+            
+        if test_success:
+            _write_nvenc_cache(cache_key)
+        return test_success
+        
+    except Exception as e:
+        print(f"Error checking NVENC availability: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 class FFmpegConverter(QThread):
     progress_update = pyqtSignal(int, float)  # Progress percentage and ETA in seconds
     conversion_complete = pyqtSignal(str)
     conversion_error = pyqtSignal(str)
+    conversion_warning = pyqtSignal(str)  # Non-fatal; the conversion keeps running
     
-    def __init__(self, input_file, output_file, preset="medium", format="mp4", use_nvenc=False):
+    def __init__(self, input_file, output_file, preset="medium", format="mp4", use_nvenc=False, threads=0,
+                 audio_codec=None, nvenc_checked=False, duration=None, limit_cores=False):
         super().__init__()
         self.input_file = input_file
         self.output_file = output_file
         self.preset = preset
         self.format = format
-        self.duration = 0
-        self.start_time = 0
+        self.threads = threads  # 0 lets FFmpeg pick the thread count
+        self.audio_codec = audio_codec  # Input audio codec, probed in run() if None
+        self.duration = duration or 0  # Probed in run() when not known up front
+        self.duration_us = 0
+        self.start_time_ns = 0
+        self.last_emit_ns = 0
         self.use_nvenc = use_nvenc
-        self.full_output = []  # Store the full output for debugging
+        self.nvenc_checked = nvenc_checked  # NVENC already confirmed working, skip the check
+        self.limit_cores = limit_cores  # Keep FFmpeg off the GUI's core / at lower priority
+        self.output_tail = collections.deque(maxlen=LOG_TAIL_LINES)  # Recent output (raw bytes) for error analysis
+        self.log_path = None  # Full FFmpeg log, kept only when the conversion fails
+        self._log_file = None
+        self._proc = None  # Running FFmpeg process
+        self._cancelled = False
         
     def run(self):
         try:
             # Clear previous output
-            self.full_output = []
+            self.output_tail.clear()
+            self.log_path = None
             
             # Check if FFmpeg is installed
             if not self._is_ffmpeg_installed():
                 self.conversion_error.emit("FFmpeg is not installed. Please install FFmpeg first.")
                 return
             
-            # Get video duration
-            self.duration = self._get_video_duration()
+            # Probe what wasn't prefetched: the duration and the input audio codec
+            # (which decides whether the audio can be copied) come from one ffprobe
+            if self.duration <= 0 or self.audio_codec is None:
+                info = VideoInfoExtractor.get_cached_video_info(self.input_file) or {}
+                if self.duration <= 0:
+                    self.duration = info.get("duration_seconds") or self._get_video_duration()
+                if self.audio_codec is None:
+                    self.audio_codec = info.get("audio_codec", "")
             if self.duration <= 0:
                 self.conversion_error.emit("Could not determine video duration.")
                 return
+            self.duration_us = max(int(self.duration * 1_000_000), 1)
                 
             # Check NVENC availability if requested
-            if self.use_nvenc and not self._is_nvenc_available():
-                self.conversion_error.emit("NVENC hardware encoding is not available. Using software encoding instead.")
+            if self.use_nvenc and not self.nvenc_checked and not _is_nvenc_available():
+                self.conversion_warning.emit("NVENC hardware encoding is not available. Using software encoding instead.")
                 self.use_nvenc = False
                 
-            # Build FFmpeg command
-            cmd = [
-                "ffmpeg",
-                "-i", self.input_file,
-            ]
-            
-            # Add encoding parameters based on whether NVENC is used
-            if self.use_nvenc:
-                cmd.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", self._get_nvenc_preset(self.preset),
-                    "-b:v", "0",  # Use variable bitrate
-                    "-c:a", "aac",
-                ])
-            else:
-                cmd.extend([
-                    "-c:v", "libx264",
-                    "-preset", self.preset,
-                    "-c:a", "aac",
-                ])
-            
-            # Add output file (with overwrite flag)
-            cmd.extend([
-                "-y",  # Overwrite output file if it exists
-                self.output_file
-            ])
-            
-            # Print command for debugging
-            print(f"Running FFmpeg command: {' '.join(cmd)}")
-            
-            # Record the start time
-            self.start_time = time.time()
-            
-            # Run the FFmpeg command
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-            
-            # Collect full output for error analysis
-            
-            # Monitor the process
-            for line in process.stdout:
-                # Save output for error analysis
-                self.full_output.append(line)
+            if self._cancelled:
+                return
                 
-                if "time=" in line:
-                    try:
-                        # Extract time information to estimate progress
-                        time_str = line.split("time=")[1].split()[0]
-                        h, m, s = time_str.split(':')
-                        current_seconds = int(h) * 3600 + int(m) * 60 + float(s)
-                        
-                        # Calculate progress percentage
-                        progress = min(int(current_seconds / self.duration * 100), 99)
-                        
-                        # Calculate ETA
-                        elapsed_time = time.time() - self.start_time
-                        if progress > 0:
-                            total_estimated_time = elapsed_time * 100 / progress
-                            eta = total_estimated_time - elapsed_time
-                        else:
-                            eta = 0
-                        
-                        self.progress_update.emit(progress, eta)
-                    except (IndexError, ValueError, ZeroDivisionError):
-                        pass
-            
-            # Wait for the process to complete
-            process.wait()
+            # Stream the FFmpeg log to a temp file instead of keeping it in memory
+            self._log_file = tempfile.NamedTemporaryFile(prefix="video_converter_", suffix=".log", delete=False)
+            self.log_path = self._log_file.name
+            try:
+                # Decode on the GPU too when encoding with NVENC so frames stay in VRAM
+                returncode = self._run_ffmpeg(self._build_command(hwaccel=self.use_nvenc))
+                
+                # Not every input can be decoded by CUVID; retry once with CPU decoding
+                if returncode != 0 and self.use_nvenc and not self._cancelled and any(
+                    error in line for line in self.output_tail for error in CUDA_DECODE_ERRORS
+                ):
+                    print("CUDA decoding failed, retrying with software decoding")
+                    self.output_tail.clear()
+                    returncode = self._run_ffmpeg(self._build_command(hwaccel=False))
+            finally:
+                self._log_file.close()
+                
+            if self._cancelled:
+                os.remove(self.log_path)
+                self.log_path = None
+                return
             
             # Check if conversion was successful
-            if process.returncode == 0:
+            if returncode == 0:
+                # The log is only needed to diagnose failures
+                os.remove(self.log_path)
+                self.log_path = None
                 self.progress_update.emit(100, 0)  # 100% progress, 0 seconds remaining
                 self.conversion_complete.emit(self.output_file)
             else:
                 # Look for NVENC-specific errors in the output
-                output_text = "".join(self.full_output)
-                if self.use_nvenc and any(error in output_text for error in [
-                    "NVENC", "GPU", "Error initializing", "CUDA", "can't initialize"
-                ]):
+                if self.use_nvenc and any(
+                    any(error in line for error in NVENC_ERRORS) for line in self.output_tail
+                ):
                     error_msg = "NVIDIA encoder error. Try disabling hardware acceleration or update your GPU drivers."
+                    output_text = b"\n".join(self.output_tail).decode("utf-8", errors="replace")
                     print(f"NVENC error detected in output: {output_text}")
                     self.conversion_error.emit(error_msg)
                 else:
-                    self.conversion_error.emit(f"Conversion failed with error code {process.returncode}")
+                    self.conversion_error.emit(f"Conversion failed with error code {returncode}")
                 
         except Exception as e:
             self.conversion_error.emit(f"Error during conversion: {str(e)}")
     
-    def _is_nvenc_available(self):
-        """Check if NVENC hardware encoding is available"""
+    def cancel(self):
+        """Ask the running FFmpeg process to stop without waiting for it"""
+        self._cancelled = True
+        self._send_signal(signal.SIGTERM)
+    
+    def kill(self):
+        """Force-stop FFmpeg after it ignored cancel()"""
+        self._send_signal(signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+    
+    def has_running_process(self):
+        """Whether FFmpeg has been started and hasn't exited yet"""
+        return self._proc is not None and self._proc.poll() is None
+    
+    def _send_signal(self, sig):
+        process = self._proc
+        if not process or process.poll() is not None:
+            return
+            
         try:
-            print("Checking NVENC availability...")
+            self._signal_process(process, sig)
+        except ProcessLookupError:
+            # FFmpeg exited on its own in the meantime
+            pass
+    
+    def _signal_process(self, process, sig):
+        """Send sig to FFmpeg's process group (or just the process on Windows)"""
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    
+    def _build_command(self, hwaccel=False):
+        """Build the FFmpeg command line for this conversion"""
+        # Build FFmpeg command
+        cmd = [_ffmpeg_path()]
+        if self.limit_cores and hasattr(os, "sched_getaffinity") and shutil.which("taskset"):
+            cpus = sorted(os.sched_getaffinity(0))
+            if len(cpus) > 1:
+                # Leave the first core to the GUI thread
+                cmd = ["taskset", "-c", ",".join(str(cpu) for cpu in cpus[1:])] + cmd
+        if hwaccel:
+            # Must come before -i to apply to the input
+            cmd.extend([
+                "-hwaccel", "cuda",
+                "-hwaccel_output_format", "cuda",
+            ])
+        cmd.extend(["-i", self.input_file])
+        
+        # Map the first video and audio streams explicitly; FFmpeg would otherwise
+        # pick the "best" audio track, which may not be the one audio_codec describes
+        cmd.extend([
+            "-map", "0:v:0",
+            "-map", "0:a:0?",  # "?" keeps inputs without audio working
+        ])
+        # Explicit maps turn off default stream selection, so carry subtitles over
+        # where the container can hold them
+        if self.format in SUBTITLE_COPY_FORMATS:
+            cmd.extend([
+                "-map", "0:s?",
+                "-c:s", "copy",
+            ])
+        
+        # Add encoding parameters based on whether NVENC is used
+        if self.use_nvenc:
+            cmd.extend([
+                "-c:v", "h264_nvenc",
+                "-preset", self._get_nvenc_preset(self.preset),
+                "-tune", "hq",
+                "-rc", "vbr",  # Constant-quality VBR
+                "-cq", "23",
+                "-b:v", "0",  # No bitrate cap, quality is set by -cq
+                "-multipass", "qres",
+            ])
+        else:
+            cmd.extend([
+                "-c:v", "libx264",
+                "-preset", self.preset,
+            ])
+            if self.threads:
+                # Pin x264's frame and lookahead threads so parallel jobs don't oversubscribe
+                cmd.extend([
+                    "-threads", str(self.threads),
+                    "-x264-params", f"threads={self.threads}:lookahead-threads={max(1, self.threads // 6)}",
+                ])
+        
+        # Copy the audio when the container accepts it instead of re-encoding
+        if self.audio_codec in AUDIO_COPY_CODECS.get(self.format, ()):
+            cmd.extend(["-c:a", "copy"])
+        else:
+            cmd.extend(["-c:a", "aac"])
             
-            # Method 1: Check if h264_nvenc encoder is listed
-            cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-encoders"
-            ]
+        # Put the index at the front of MP4 files so they can start playing early
+        if self.format == "mp4":
+            cmd.extend(["-movflags", "+faststart"])
+        
+        # Report structured progress on stdout instead of the stats line
+        cmd.extend([
+            "-progress", "pipe:1",
+            "-nostats",
+            "-hide_banner",
+        ])
+        
+        # Add output file (with overwrite flag)
+        cmd.extend([
+            "-y",  # Overwrite output file if it exists
+            self.output_file
+        ])
+        return cmd
+    
+    def _run_ffmpeg(self, cmd):
+        """Run FFmpeg, reporting progress as it goes, and return its exit code"""
+        # Print command for debugging
+        print(f"Running FFmpeg command: {' '.join(cmd)}")
+        
+        # Record the start time
+        self.start_time_ns = time.monotonic_ns()
+        
+        # Windows has no taskset; run FFmpeg below normal priority there instead
+        creationflags = 0
+        if self.limit_cores and sys.platform == "win32":
+            creationflags = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+        
+        # Run the FFmpeg command (stderr is merged so it still ends up in the logs)
+        # in its own process group so cancel() can stop it and any children
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+            start_new_session=True,
+            creationflags=creationflags
+        )
+        self._proc = process
+        if self._cancelled:
+            # cancel() ran before the process existed
+            process.terminate()
+        
+        # Monitor the process in fixed-size chunks so progress isn't held
+        # back by line buffering
+        fd = process.stdout.fileno()
+        tail = b""
+        while not self._cancelled:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            lines = (tail + chunk).replace(b"\r", b"\n").split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                self._process_output_line(line)
+        if tail:
+            self._process_output_line(tail)
+        process.stdout.close()
+        
+        # Wait for the process to complete
+        process.wait()
+        return process.returncode
+    
+    def _process_output_line(self, line):
+        """Log a line of FFmpeg output and emit progress for out_time_us entries"""
+        if not line:
+            return
             
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            has_nvenc_listed = "h264_nvenc" in result.stdout
+        key, _, value = line.partition(b"=")
+        if key not in PROGRESS_KEYS and not key.startswith(PROGRESS_STREAM_PREFIX):
+            # Save output for debugging and error analysis
+            self._log_file.write(line + b"\n")
+            self.output_tail.append(line)
+        elif key == b"out_time_us":
+            try:
+                current_us = int(value)
+            except ValueError:
+                # out_time_us is "N/A" until the first frame is written
+                return
+                
+            # Calculate progress percentage
+            progress = min(max(current_us, 0) * 100 // self.duration_us, 99)
             
-            print(f"NVENC in encoders list: {has_nvenc_listed}")
+            # Rate-limit updates so parallel jobs don't flood the GUI thread
+            now_ns = time.monotonic_ns()
+            if progress < 99 and now_ns - self.last_emit_ns < PROGRESS_INTERVAL_NS:
+                return
+            self.last_emit_ns = now_ns
             
-            if not has_nvenc_listed:
-                print("NVENC encoder not found in FFmpeg encoders list")
-                return False
+            # Calculate ETA: remaining = elapsed * (100 - progress) / progress
+            if progress > 0:
+                elapsed_ns = now_ns - self.start_time_ns
+                eta = elapsed_ns * (100 - progress) // progress / 1e9
+            else:
+                eta = 0
             
-            # Method 2: Print GPU information for debugging
-            try:
-                nvidia_info_cmd = ["nvidia-smi"]
-                nvidia_result = subprocess.run(
-                    nvidia_info_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=5
-                )
-                print("NVIDIA GPU info:")
-                print(nvidia_result.stdout)
-            except Exception as e:
-                print(f"nvidia-smi not available: {str(e)}")
+            self.progress_update.emit(progress, eta)
+    
+    def _get_nvenc_preset(self, standard_preset):
+        """Map standard x264 presets to NVENC equivalents"""
+        return NVENC_PRESETS.get(standard_preset, "p3")  # Default to p3 (medium)
+    
+    def _get_video_duration(self):
+        """Get the duration of the input video in seconds."""
+        try:
+            # Key the cache on the file's stat so edited files are probed again
+            stat = os.stat(self.input_file)
+            return _probe_duration(self.input_file, stat.st_mtime_ns, stat.st_size)
+        except Exception:
+            return 0
+    
+    def _is_ffmpeg_installed(self):
+        """Check if FFmpeg is installed on the system."""
+        return _ffmpeg_path() is not None
+
+class NvencProbe(QThread):
+    """One-shot background check for NVENC support"""
+    result = pyqtSignal(bool)
+    
+    def run(self):
+        self.result.emit(_is_nvenc_available())
+
+class NvencTestThread(QThread):
+    """Manual NVENC test encode, run from the Test NVENC button"""
+    test_complete = pyqtSignal(bool, str)
+    
+    def run(self):
+        try:
+            if _ffmpeg_path() is None:
+                self.test_complete.emit(False, "FFmpeg is not installed. Please install FFmpeg first.")
+                return
+                
+            # Skip the test encode when this FFmpeg build has no NVENC encoder at all
+            encoders = subprocess.run(
+                [_ffmpeg_path(), "-hide_banner", "-encoders"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=10
+            )
+            if "h264_nvenc" not in encoders.stdout:
+                self.test_complete.emit(False, "This FFmpeg build doesn't include the NVENC (h264_nvenc) encoder.")
+                return
                 
-            # Method 3: Try a simple test encode with very strict parameters
-            # This is designed to succeed even on older GPUs
+            # Try much more lenient test parameters
             test_cmd = [
-                "ffmpeg",
+                _ffmpeg_path(),
                 "-hide_banner",
                 "-y",
                 "-f", "lavfi",
                 "-i", "color=c=black:s=32x32:r=1:d=1",
-                "-c:v", "h264_nvenc",
-                "-preset", "p1", # fastest preset
-                "-profile:v", "baseline",
-                "-b:v", "250k",
+                "-c:v", "h264_nvenc",  # Use NVENC
+                "-gpu", "any",  # Try any GPU
+                "-preset", NVENC_PRESETS["veryfast"],  # Fastest preset
+                "-profile:v", "baseline", # Simplest profile
+                "-b:v", "100k",  # Very low bitrate
+                "-t", "1",  # 1 second duration
                 "-f", "null",
                 "-"
             ]
             
-            print(f"Running NVENC test: {' '.join(test_cmd)}")
-            
-            test_result = subprocess.run(
-                test_cmd, 
+            # Run the test
+            result = subprocess.run(
+                test_cmd,
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE, 
                 text=True,
                 timeout=10
             )
             
-            test_success = test_result.returncode == 0
-            print(f"NVENC test result: {'Success' if test_success else 'Failed'}")
-            if not test_success:
-                print("NVENC test output:")
-                print(test_result.stderr)
-                
-            return test_success
-            
-        except Exception as e:
-            print(f"Error checking NVENC availability: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return False
-            
-    def _get_nvenc_preset(self, standard_preset):
-        """Map standard x264 presets to NVENC equivalents"""
-        # NVENC has different preset names
-        nvenc_presets = {
-            "veryfast": "p1",   # Fastest/lowest quality
-            "medium": "p4",     # Balanced
-            "veryslow": "p7"    # Slowest/highest quality
-        }
-        return nvenc_presets.get(standard_preset, "p4")  # Default to p4 (medium)
-    
-    def _get_video_duration(self):
-        """Get the duration of the input video in seconds."""
-        try:
-            cmd = [
-                "ffprobe",
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                self.input_file
-            ]
-            
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            # Collect results
+            success = result.returncode == 0
+            details = result.stderr if not success else "NVENC test successful!"
             
-            if result.returncode == 0 and result.stdout.strip():
-                return float(result.stdout.strip())
+            # Check for specific error messages
+            if not success:
+                if "No NVENC capable devices found" in details:
+                    details = "No NVENC capable devices found. Your GPU may not support NVENC or drivers may be missing."
+                elif "Generic error in an external library" in details:
+                    details = "Generic NVENC error. Try updating your NVIDIA drivers to the latest version."
+                elif "Cannot load nvenc" in details:
+                    details = "Cannot load NVENC library. Ensure you have the latest NVIDIA drivers installed."
+                elif "is not a NVENC capable device" in details:
+                    details = "Your GPU doesn't support NVENC encoding. Check GPU compatibility."
             else:
-                # Fallback method if ffprobe fails
-                cmd = [
-                    "ffmpeg",
-                    "-i", self.input_file
-                ]
-                
-                result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                
-                # Parse the output to find duration
-                duration_pattern = r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d+)"
-                match = re.search(duration_pattern, result.stderr)
-                
-                if match:
-                    h, m, s = match.groups()
-                    return int(h) * 3600 + int(m) * 60 + float(s)
-                    
-            return 0
-        except Exception:
-            return 0
-    
-    def _is_ffmpeg_installed(self):
-        """Check if FFmpeg is installed on the system."""
-        try:
-            subprocess.run(["ffmpeg", "-version"], 
-                           stdout=subprocess.PIPE, 
-                           stderr=subprocess.PIPE, 
-                           check=False)
-            return True
-        except FileNotFoundError:
-            return False
+                # Let a manual test correct an earlier failed startup probe
+                _write_nvenc_cache(_nvenc_cache_key(_query_nvidia_gpu()))
+            
+            self.test_complete.emit(success, details)
+        
+        except Exception as e:
+            self.test_complete.emit(False, f"Error testing NVENC: {str(e)}")
 
 class DragDropListWidget(QListWidget):
     files_dropped = pyqtSignal(list)
+    remove_requested = pyqtSignal()
+    clear_requested = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -293,12 +677,16 @@ class DragDropListWidget(QListWidget):
     def dropEvent(self, event: QDropEvent):
         if event.mimeData().hasUrls():
             file_paths = []
+            seen = set()
             for url in event.mimeData().urls():
                 path = url.toLocalFile()
+                if path in seen:
+                    continue
+                seen.add(path)
                 if os.path.isfile(path):
                     # Check if it's a video file by extension
                     ext = os.path.splitext(path)[1].lower()
-                    if ext in ['.mp4', '.mkv', '.avi', '.mov', '.webm', '.flv']:
+                    if ext in VIDEO_EXTENSIONS:
                         file_paths.append(path)
             
             if file_paths:
@@ -309,25 +697,39 @@ class DragDropListWidget(QListWidget):
     def contextMenuEvent(self, event):
         context_menu = QMenu(self)
         remove_action = QAction("Remove selected", self)
-        remove_action.triggered.connect(self.remove_selected_items)
+        remove_action.triggered.connect(self.remove_requested)
         context_menu.addAction(remove_action)
         
         clear_action = QAction("Clear all", self)
-        clear_action.triggered.connect(self.clear)
+        clear_action.triggered.connect(self.clear_requested)
         context_menu.addAction(clear_action)
         
         context_menu.exec_(event.globalPos())
-    
-    def remove_selected_items(self):
-        selected_items = self.selectedItems()
-        if not selected_items:
-            return
-            
-        for item in selected_items:
-            row = self.row(item)
-            self.takeItem(row)
 
 class VideoInfoExtractor:
+    @staticmethod
+    def stat_key(file_path):
+        """(mtime_ns, size) of file_path, which changes when the file is edited; None if missing"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+        
+    @staticmethod
+    def get_cached_video_info(file_path, stat_key=None):
+        """Get video information, reusing earlier results while the file is unchanged"""
+        stat_key = stat_key or VideoInfoExtractor.stat_key(file_path)
+        if stat_key is None:
+            return None
+        return VideoInfoExtractor._get_video_info_for_stat(file_path, *stat_key)
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _get_video_info_for_stat(file_path, mtime_ns, size):
+        """Cached get_video_info; mtime_ns and size only key the cache"""
+        return VideoInfoExtractor.get_video_info(file_path)
+        
     @staticmethod
     def get_video_info(file_path):
         """Get information about the video file using ffprobe"""
@@ -353,6 +755,7 @@ class VideoInfoExtractor:
                 "filename": os.path.basename(file_path),
                 "filesize": "",
                 "duration": "",
+                "duration_seconds": 0.0,
                 "resolution": "",
                 "video_codec": "",
                 "audio_codec": "",
@@ -374,6 +777,7 @@ class VideoInfoExtractor:
                 # Duration
                 if "duration" in format_info:
                     seconds = float(format_info["duration"])
+                    video_info["duration_seconds"] = seconds
                     hours = int(seconds // 3600)
                     minutes = int((seconds % 3600) // 60)
                     secs = seconds % 60
@@ -386,9 +790,16 @@ class VideoInfoExtractor:
             
             # Stream information
             if "streams" in info:
+                # Only the first video and audio streams are converted (see -map)
+                seen_types = set()
                 for stream in info["streams"]:
+                    codec_type = stream.get("codec_type")
+                    if codec_type in seen_types:
+                        continue
+                    seen_types.add(codec_type)
+                    
                     # Video stream
-                    if stream.get("codec_type") == "video":
+                    if codec_type == "video":
                         # Resolution
                         if "width" in stream and "height" in stream:
                             video_info["resolution"] = f"{stream['width']}x{stream['height']}"
@@ -398,7 +809,7 @@ class VideoInfoExtractor:
                             video_info["video_codec"] = stream["codec_name"]
                     
                     # Audio stream
-                    elif stream.get("codec_type") == "audio":
+                    elif codec_type == "audio":
                         # Audio codec
                         if "codec_name" in stream:
                             video_info["audio_codec"] = stream["codec_name"]
@@ -408,14 +819,49 @@ class VideoInfoExtractor:
             print(f"Error getting video info: {str(e)}")
             return None
 
+class VideoInfoSignals(QObject):
+    info_ready = pyqtSignal(str, object, object)  # File path, its stat key and info dict (None on failure)
+
+class VideoInfoTask(QRunnable):
+    """Fetch video information for one file on a thread pool"""
+    def __init__(self, file_path, signals):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = signals
+        
+    def run(self):
+        stat_key = VideoInfoExtractor.stat_key(self.file_path)
+        info = VideoInfoExtractor.get_cached_video_info(self.file_path, stat_key)
+        self.signals.info_ready.emit(self.file_path, stat_key, info)
+
 class VideoConverterApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.init_ui()
-        self.converter_threads = []
+        self.converter_threads = collections.deque()  # Conversions waiting to start
+        self.active_threads = []  # Conversions currently running
+        self._stopping_threads = set()  # Cancelled conversions still winding down
+        self.job_progress = {}  # Converter -> (progress, eta)
+        self._batch_total = 0
+        self._batch_done = 0
+        self.max_parallel = 1
+        self._last_progress_ts = 0.0
         self.input_files = []
+        self._basename_index = {}  # List display name -> full file path
+        self.video_info = {}  # File path -> (stat key, info dict), filled in the background
+        self.shown_info_path = None  # File whose information is being displayed
         self.processing_all = False
         self.last_conversion_output = ""
+        self.last_conversion_log_path = None
+        self._ffmpeg_available = _ffmpeg_path() is not None
+        self._nvenc_available = None  # Unknown until the probe or a manual test finishes
+        self._nvenc_test_result = None  # (success, details) of the Test NVENC run
+        
+        # Shared pool for fetching video information of added files
+        self.info_pool = QThreadPool()
+        self.info_pool.setMaxThreadCount(min(8, os.cpu_count() or 1))
+        self.info_signals = VideoInfoSignals()
+        self.info_signals.info_ready.connect(self.video_info_ready)
         
         # Check for FFmpeg availability at startup
         self.check_ffmpeg_availability()
@@ -428,16 +874,12 @@ class VideoConverterApp(QMainWindow):
         if not self._is_ffmpeg_installed():
             self.show_ffmpeg_not_found_message()
             
-    def _is_ffmpeg_installed(self):
-        """Check if FFmpeg is installed on the system."""
-        try:
-            subprocess.run(["ffmpeg", "-version"], 
-                           stdout=subprocess.PIPE, 
-                           stderr=subprocess.PIPE, 
-                           check=False)
-            return True
-        except FileNotFoundError:
-            return False
+    def _is_ffmpeg_installed(self, refresh=False):
+        """Check if FFmpeg is installed on the system (cached unless refresh is set)."""
+        if refresh:
+            _ffmpeg_path.cache_clear()
+            self._ffmpeg_available = _ffmpeg_path() is not None
+        return self._ffmpeg_available
             
     def show_ffmpeg_not_found_message(self):
         """Show a detailed message about FFmpeg installation"""
@@ -477,36 +919,33 @@ class VideoConverterApp(QMainWindow):
             webbrowser.open(ffmpeg_url)
     
     def check_nvenc_availability(self):
-        """Check if NVENC is available and update the UI"""
-        try:
-            print("\n--- NVENC Detection Started ---")
-            # Create a temporary converter to check NVENC
-            temp_converter = FFmpegConverter("", "", use_nvenc=True)
-            has_nvenc = temp_converter._is_nvenc_available()
+        """Start the NVENC probe in the background; the UI is updated when it finishes"""
+        print("\n--- NVENC Detection Started ---")
+        # Keep a reference on self so the thread isn't garbage collected mid-run
+        self._nvenc_probe = NvencProbe()
+        self._nvenc_probe.result.connect(self._on_nvenc_result)
+        self._nvenc_probe.start()
+        
+    def _on_nvenc_result(self, has_nvenc):
+        """Update the NVENC checkbox with the probe result"""
+        self._nvenc_available = has_nvenc
+        # Update checkbox text with availability status
+        if has_nvenc:
+            self.nvenc_checkbox.setText("Use NVIDIA NVENC hardware acceleration ✓")
+            self.nvenc_checkbox.setChecked(True)  # Enable by default if available
+            print("NVENC detected and enabled")
+        else:
+            self.nvenc_checkbox.setText("Use NVIDIA NVENC hardware acceleration ✗")
+            self.nvenc_checkbox.setToolTip("NVIDIA GPU encoder not detected or not working.\nEnsure your GPU supports NVENC and drivers are up to date.")
+            # Keep it enabled so user can try anyway
+            self.nvenc_checkbox.setChecked(False)
+            print("NVENC not detected, checkbox disabled")
             
-            # Update checkbox text with availability status
-            if has_nvenc:
-                self.nvenc_checkbox.setText("Use NVIDIA NVENC hardware acceleration ✓")
-                self.nvenc_checkbox.setEnabled(True)
-                self.nvenc_checkbox.setChecked(True)  # Enable by default if available
-                print("NVENC detected and enabled")
-            else:
-                self.nvenc_checkbox.setText("Use NVIDIA NVENC hardware acceleration ✗")
-                self.nvenc_checkbox.setToolTip("NVIDIA GPU encoder not detected or not working.\nEnsure your GPU supports NVENC and drivers are up to date.")
-                # Keep it enabled so user can try anyway
-                self.nvenc_checkbox.setEnabled(True)
-                self.nvenc_checkbox.setChecked(False)
-                print("NVENC not detected, checkbox disabled")
-                
-            print("--- NVENC Detection Completed ---\n")
-                
-        except Exception as e:
-            print(f"Error checking NVENC: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            self.nvenc_checkbox.setText("Use NVIDIA NVENC hardware acceleration (status unknown)")
+        # Don't re-enable the checkbox while a conversion is running
+        if self.convert_btn.isEnabled():
             self.nvenc_checkbox.setEnabled(True)
-            self.nvenc_checkbox.setChecked(False)
+            
+        print("--- NVENC Detection Completed ---\n")
             
     def init_ui(self):
         self.setWindowTitle("Video Converter")
@@ -534,6 +973,8 @@ class VideoConverterApp(QMainWindow):
         # Use custom drag-drop list widget
         self.file_list = DragDropListWidget()
         self.file_list.files_dropped.connect(self.add_dropped_files)
+        self.file_list.remove_requested.connect(self.remove_selected_files)
+        self.file_list.clear_requested.connect(self.clear_all_files)
         self.file_list.itemSelectionChanged.connect(self.update_remove_button)
         self.file_list.itemClicked.connect(self.show_video_info)
         
@@ -602,16 +1043,23 @@ class VideoConverterApp(QMainWindow):
         preset_layout = QHBoxLayout()
         preset_layout.addWidget(QLabel("Quality Preset:"))
         self.preset_combo = QComboBox()
-        self.preset_combo.addItems(["Fast (Low Quality)", "Medium Quality", "Slow (High Quality)"])
+        for label, preset in UI_PRESETS.items():
+            self.preset_combo.addItem(label, preset)  # FFmpeg preset stored as item data
         self.preset_combo.setCurrentText("Medium Quality")
         preset_layout.addWidget(self.preset_combo)
         
         # Batch conversion checkbox
         batch_layout = QHBoxLayout()
-        self.batch_checkbox = QCheckBox("Process all files sequentially")
+        self.batch_checkbox = QCheckBox("Process all files")
         self.batch_checkbox.setChecked(True)
         batch_layout.addWidget(self.batch_checkbox)
         
+        # Keep a core free for the UI while encoding
+        self.limit_cores_checkbox = QCheckBox("Keep UI responsive (limit encoder cores)")
+        self.limit_cores_checkbox.setChecked(False)
+        self.limit_cores_checkbox.setToolTip("Leaves one CPU core to the application (lower priority on Windows).\nEncoding may be slightly slower.")
+        batch_layout.addWidget(self.limit_cores_checkbox)
+        
         # NVENC hardware acceleration checkbox
         nvenc_layout = QHBoxLayout()
         self.nvenc_checkbox = QCheckBox("Use NVIDIA NVENC hardware acceleration (checking...)")
@@ -682,16 +1130,22 @@ class VideoConverterApp(QMainWindow):
             self,
             "Select Video Files",
             "",
-            "Video Files (*.mp4 *.mkv *.avi *.mov *.webm *.flv);;All Files (*)"
+            f"Video Files ({' '.join('*' + ext for ext in sorted(VIDEO_EXTENSIONS))});;All Files (*)"
         )
         
         if files:
             self.input_files = files
+            self._basename_index = {}
+            self.video_info = {path: self.video_info[path] for path in files if path in self.video_info}
+            self.file_list.setUpdatesEnabled(False)
+            self.file_list.blockSignals(True)
             self.file_list.clear()
-            for file in files:
-                self.file_list.addItem(os.path.basename(file))
+            self.file_list.addItems([self._index_file(file) for file in files])
+            self.file_list.blockSignals(False)
+            self.file_list.setUpdatesEnabled(True)
             self.file_label.setText(f"{len(files)} file(s) selected")
             self.update_remove_button()
+            self.prefetch_video_info(files)
             
     def select_output_dir(self):
         directory = QFileDialog.getExistingDirectory(
@@ -709,23 +1163,17 @@ class VideoConverterApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select at least one input file.")
             return
             
-        # Check if FFmpeg is installed
-        if not self._is_ffmpeg_installed():
+        # Check if FFmpeg is installed (refreshed in case it was installed meanwhile)
+        if not self._is_ffmpeg_installed(refresh=True):
             self.show_ffmpeg_not_found_message()
             return
             
         # Get selected options
-        selected_preset_display = self.preset_combo.currentText()
-        # Map the user-friendly preset names to FFmpeg preset values
-        preset_mapping = {
-            "Fast (Low Quality)": "veryfast",
-            "Medium Quality": "medium",
-            "Slow (High Quality)": "veryslow"
-        }
-        selected_preset = preset_mapping[selected_preset_display]
+        selected_preset = self.preset_combo.currentData()
         selected_format = self.format_combo.currentText()
         self.processing_all = self.batch_checkbox.isChecked()
         use_nvenc = self.nvenc_checkbox.isChecked()
+        limit_cores = self.limit_cores_checkbox.isChecked()
         
         # Warn about NVENC if it wasn't detected but is being used
         if use_nvenc and "✗" in self.nvenc_checkbox.text():
@@ -754,19 +1202,50 @@ class VideoConverterApp(QMainWindow):
         self.format_combo.setEnabled(False)
         self.preset_combo.setEnabled(False)
         self.batch_checkbox.setEnabled(False)
+        self.limit_cores_checkbox.setEnabled(False)
         self.nvenc_checkbox.setEnabled(False)
         
         # Clear any existing converter threads
-        self.converter_threads = []
+        self.converter_threads = collections.deque()
+        self.active_threads = []
+        self.job_progress = {}
+        
+        # Without batch processing only the first file is converted
+        input_files = self.input_files if self.processing_all else self.input_files[:1]
+        
+        # Limit how many conversions run at once: consumer GPUs only allow a couple
+        # of NVENC sessions, and each x264 encode gets its own share of the cores.
+        # Never plan for more jobs than files so short batches keep every core busy
+        cpus = _available_cpus()
+        if limit_cores:
+            cpus = max(1, cpus - 1)
+        if use_nvenc:
+            self.max_parallel = NVENC_MAX_SESSIONS
+        else:
+            self.max_parallel = max(1, cpus // X264_THREADS_PER_JOB)
+        self.max_parallel = min(self.max_parallel, len(input_files))
+        # Split the available cores between the jobs that run at the same time
+        threads = max(1, cpus // self.max_parallel)
         
         # Create converter threads for all files
-        for input_file in self.input_files:
+        planned_outputs = set()  # Normalized output paths already given to a job
+        for input_file in input_files:
             # Determine output file path
-            if self.output_directory:
-                output_filename = os.path.splitext(os.path.basename(input_file))[0] + f".{selected_format}"
-                output_file = os.path.join(self.output_directory, output_filename)
-            else:
-                output_file = os.path.splitext(input_file)[0] + f".{selected_format}"
+            input_dir, input_name = os.path.split(input_file)
+            output_dir = self.output_directory or input_dir
+            output_stem = os.path.splitext(input_name)[0]
+            output_file = os.path.join(output_dir, f"{output_stem}.{selected_format}")
+            
+            # Parallel jobs must never write the same file (e.g. x.mp4 and x.mkv,
+            # or same-named files from different folders); number the clashes
+            suffix = 1
+            while os.path.normcase(os.path.abspath(output_file)) in planned_outputs:
+                output_file = os.path.join(output_dir, f"{output_stem} ({suffix}).{selected_format}")
+                suffix += 1
+            planned_outputs.add(os.path.normcase(os.path.abspath(output_file)))
+            
+            # Reuse already fetched video information to skip probing again
+            info = self.known_video_info(input_file) or {}
             
             # Create converter thread
             converter = FFmpegConverter(
@@ -774,41 +1253,79 @@ class VideoConverterApp(QMainWindow):
                 output_file=output_file,
                 preset=selected_preset,
                 format=selected_format,
-                use_nvenc=use_nvenc
+                use_nvenc=use_nvenc,
+                threads=threads,
+                audio_codec=info.get("audio_codec"),
+                nvenc_checked=self._nvenc_available is True,
+                duration=info.get("duration_seconds"),
+                limit_cores=limit_cores
             )
             
             # Connect signals
             converter.progress_update.connect(self.update_progress)
             converter.conversion_complete.connect(self.conversion_completed)
             converter.conversion_error.connect(self.conversion_failed)
+            converter.conversion_warning.connect(self.conversion_warned)
             
             # Add to thread list
             self.converter_threads.append(converter)
+            self.job_progress[converter] = (0, 0)
+        
+        self._batch_total = len(self.converter_threads)
+        self._batch_done = 0
         
-        # Start the first conversion
+        # Start the first conversions
         if self.converter_threads:
-            current_thread = self.converter_threads[0]
-            current_file = os.path.basename(current_thread.input_file)
-            self.current_file_label.setText(f"Processing: {current_file} (1/{len(self.converter_threads)})")
             self.status_label.setText("Converting...")
             self.eta_label.setText("Calculating...")
             self.progress_bar.setValue(0)
-            current_thread.start()
+            self.start_pending_conversions()
+    
+    def start_pending_conversions(self):
+        """Start queued conversions until the parallel limit is reached"""
+        while self.converter_threads and len(self.active_threads) < self.max_parallel:
+            next_thread = self.converter_threads.popleft()
+            self.active_threads.append(next_thread)
+            next_thread.start()
+            
+        active_files = ", ".join(os.path.basename(t.input_file) for t in self.active_threads)
+        self.current_file_label.setText(
+            f"Processing: {active_files} ({self._batch_done}/{self._batch_total} done)"
+        )
     
     def cancel_conversion(self):
-        # Terminate all running conversions
-        for thread in self.converter_threads:
-            if thread.isRunning():
-                thread.terminate()
-                thread.wait()
-        
-        self.converter_threads = []
+        # Signal every running conversion first so they all shut down together
+        running = [thread for thread in self.active_threads if thread.isRunning()]
+        for thread in running:
+            thread.cancel()
+            
+        # Give the FFmpeg processes one shared deadline to exit, then kill the
+        # stragglers; jobs that haven't started FFmpeg yet return on their own
+        deadline = time.monotonic() + CANCEL_TIMEOUT_MS / 1000
+        for thread in running:
+            if thread.has_running_process():
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if not thread.wait(max(remaining_ms, 0)):
+                    thread.kill()
+                    
+            # Keep a reference until the thread ends so Qt doesn't destroy it while running
+            self._stopping_threads.add(thread)
+            thread.finished.connect(self.cancelled_thread_finished)
+            if thread.isFinished():
+                self._stopping_threads.discard(thread)
+        
+        self.converter_threads = collections.deque()
+        self.active_threads = []
         self.reset_ui()
         self.status_label.setText("Conversion cancelled")
         self.progress_bar.setValue(0)
         self.current_file_label.setText("")
         self.eta_label.setText("")
     
+    def cancelled_thread_finished(self):
+        """Drop the reference to a cancelled conversion once its thread has ended"""
+        self._stopping_threads.discard(self.sender())
+    
     def reset_ui(self):
         self.convert_btn.setEnabled(True)
         self.cancel_btn.setEnabled(False)
@@ -817,129 +1334,145 @@ class VideoConverterApp(QMainWindow):
         self.format_combo.setEnabled(True)
         self.preset_combo.setEnabled(True)
         self.batch_checkbox.setEnabled(True)
+        self.limit_cores_checkbox.setEnabled(True)
         self.nvenc_checkbox.setEnabled(True)
     
     def update_progress(self, value, eta_seconds):
         """Update progress bar and ETA display"""
-        self.progress_bar.setValue(value)
+        thread = self.sender()
+        if thread not in self.active_threads:
+            return
+        self.job_progress[thread] = (value, eta_seconds)
+        
+        # Repaint at most ~10 times a second; always let a finished job through
+        now = time.monotonic()
+        if value < 100 and now - self._last_progress_ts < 0.1:
+            return
+        self._last_progress_ts = now
+        
+        # Show overall batch progress and the ETA of the slowest running job
+        total_progress = sum(progress for progress, _ in self.job_progress.values())
+        self.progress_bar.setValue(total_progress // self._batch_total)
+        eta_seconds = max(self.job_progress[t][1] for t in self.active_threads)
         
         # Format the ETA
         if eta_seconds > 0:
-            if eta_seconds < 60:
-                eta_text = f"ETA: {int(eta_seconds)}s"
-            elif eta_seconds < 3600:
-                minutes = int(eta_seconds // 60)
-                seconds = int(eta_seconds % 60)
+            minutes, seconds = divmod(int(eta_seconds), 60)
+            hours, minutes = divmod(minutes, 60)
+            if hours:
+                eta_text = f"ETA: {hours}h {minutes}m"
+            elif minutes:
                 eta_text = f"ETA: {minutes}m {seconds}s"
             else:
-                hours = int(eta_seconds // 3600)
-                minutes = int((eta_seconds % 3600) // 60)
-                eta_text = f"ETA: {hours}h {minutes}m"
+                eta_text = f"ETA: {seconds}s"
+        else:
+            eta_text = "Almost done..."
             
+        # Only relayout the label when the visible text changes
+        if eta_text != self.eta_label.text():
             self.eta_label.setText(eta_text)
-        else:
-            self.eta_label.setText("Almost done...")
     
     def conversion_completed(self, output_file):
-        self.progress_bar.setValue(100)
-        self.eta_label.setText("")
-        
         # Remove completed thread
-        if self.converter_threads:
-            completed_thread = self.converter_threads.pop(0)
-            completed_file = os.path.basename(completed_thread.input_file)
-            
-            # Update status
-            self.status_label.setText(f"Completed: {completed_file}")
-            
-            # If batch processing and more files to process
-            if self.processing_all and self.converter_threads:
-                next_thread = self.converter_threads[0]
-                next_file = os.path.basename(next_thread.input_file)
-                self.current_file_label.setText(
-                    f"Processing: {next_file} ({len(self.input_files) - len(self.converter_threads)}/{len(self.input_files)})"
+        completed_thread = self.sender()
+        if completed_thread not in self.active_threads:
+            return
+        self.active_threads.remove(completed_thread)
+        self.job_progress[completed_thread] = (100, 0)
+        self._batch_done += 1
+        completed_file = os.path.basename(completed_thread.input_file)
+        
+        # Update status
+        self.status_label.setText(f"Completed: {completed_file}")
+        
+        # If more files to process
+        if self.converter_threads or self.active_threads:
+            self.start_pending_conversions()
+        else:
+            # All conversions completed
+            self.progress_bar.setValue(100)
+            self.eta_label.setText("")
+            self.reset_ui()
+            if self._batch_total > 1:
+                QMessageBox.information(
+                    self, 
+                    "Success", 
+                    f"All conversions completed successfully!"
                 )
-                self.progress_bar.setValue(0)
-                self.eta_label.setText("Calculating...")
-                next_thread.start()
             else:
-                # All conversions completed or not batch processing
-                if not self.converter_threads or not self.processing_all:
-                    self.reset_ui()
-                    if len(self.input_files) > 1:
-                        QMessageBox.information(
-                            self, 
-                            "Success", 
-                            f"All conversions completed successfully!"
-                        )
-                    else:
-                        QMessageBox.information(
-                            self, 
-                            "Success", 
-                            f"Conversion complete!\nOutput file: {output_file}"
-                        )
-                    self.current_file_label.setText("")
-                    self.status_label.setText("Ready")
+                QMessageBox.information(
+                    self, 
+                    "Success", 
+                    f"Conversion complete!\nOutput file: {output_file}"
+                )
+            self.current_file_label.setText("")
+            self.status_label.setText("Ready")
+    
+    def conversion_warned(self, warning_message):
+        """Show a non-fatal converter message; the job stays active"""
+        warned_thread = self.sender()
+        if warned_thread not in self.active_threads:
+            return
+        self.status_label.setText(f"{os.path.basename(warned_thread.input_file)}: {warning_message}")
     
     def conversion_failed(self, error_message):
         # Remove failed thread
-        if self.converter_threads:
-            failed_thread = self.converter_threads.pop(0)
-            failed_file = os.path.basename(failed_thread.input_file)
-            
-            # Save conversion output for logs
-            if hasattr(failed_thread, 'full_output'):
-                self.last_conversion_output = "".join(failed_thread.full_output)
-                self.view_logs_btn.setEnabled(True)
-            
-            # Update UI
-            self.status_label.setText(f"Error: {error_message}")
-            QMessageBox.critical(
-                self, 
-                "Error", 
-                f"Conversion failed for {failed_file}: {error_message}"
-            )
-            
-            # If batch processing and more files to process
-            if self.processing_all and self.converter_threads:
-                next_thread = self.converter_threads[0]
-                next_file = os.path.basename(next_thread.input_file)
-                self.current_file_label.setText(
-                    f"Processing: {next_file} ({len(self.input_files) - len(self.converter_threads)}/{len(self.input_files)})"
-                )
-                self.progress_bar.setValue(0)
-                self.eta_label.setText("Calculating...")
-                next_thread.start()
-            else:
-                # All conversions completed or not batch processing
-                self.reset_ui()
-                self.current_file_label.setText("")
-                self.eta_label.setText("")
+        failed_thread = self.sender()
+        if failed_thread not in self.active_threads:
+            return
+        self.active_threads.remove(failed_thread)
+        self.job_progress[failed_thread] = (100, 0)
+        self._batch_done += 1
+        failed_file = os.path.basename(failed_thread.input_file)
+        
+        # Save conversion output for logs
+        if failed_thread.log_path:  # Set by FFmpegConverter once FFmpeg has started
+            self.set_conversion_log("", failed_thread.log_path)
+            self.view_logs_btn.setEnabled(True)
+        
+        # Keep the remaining conversions going while the error is shown
+        if self.converter_threads or self.active_threads:
+            self.start_pending_conversions()
+        else:
+            # All conversions completed
+            self.reset_ui()
+            self.current_file_label.setText("")
+            self.eta_label.setText("")
+        
+        # Update UI
+        self.status_label.setText(f"Error: {error_message}")
+        QMessageBox.critical(
+            self, 
+            "Error", 
+            f"Conversion failed for {failed_file}: {error_message}"
+        )
 
     def update_remove_button(self):
         self.remove_btn.setEnabled(len(self.file_list.selectedItems()) > 0)
         self.clear_btn.setEnabled(self.file_list.count() > 0)
         
     def remove_selected_files(self):
-        selected_items = self.file_list.selectedItems()
-        if not selected_items:
+        # List rows line up with input_files, so remove by row from the bottom up
+        rows = sorted({index.row() for index in self.file_list.selectedIndexes()}, reverse=True)
+        if not rows:
             return
             
-        selected_names = [item.text() for item in selected_items]
-        
-        # Remove from input_files list
-        self.input_files = [
-            f for f in self.input_files 
-            if os.path.basename(f) not in selected_names
-        ]
+        self.file_list.setUpdatesEnabled(False)
+        for row in rows:
+            self.video_info.pop(self.input_files[row], None)
+            del self.input_files[row]
+            item = self.file_list.takeItem(row)
+            self._basename_index.pop(item.text(), None)
+        self.file_list.setUpdatesEnabled(True)
         
         # Update UI
-        self.file_list.remove_selected_items()
         self.file_label.setText(f"{len(self.input_files)} file(s) selected")
         self.update_remove_button()
         
     def clear_all_files(self):
         self.input_files = []
+        self.video_info = {}
+        self._basename_index = {}
         self.file_list.clear()
         self.file_label.setText("No file selected")
         self.update_remove_button()
@@ -949,65 +1482,109 @@ class VideoConverterApp(QMainWindow):
         if not file_paths:
             return
             
-        # Update input files list
-        if not self.input_files:
-            self.input_files = file_paths
-        else:
-            # Add only new files
-            for path in file_paths:
-                if path not in self.input_files:
-                    self.input_files.append(path)
-        
-        # Update UI
-        self.file_list.clear()
-        for file in self.input_files:
-            self.file_list.addItem(os.path.basename(file))
+        # Add only new files
+        existing = set(self.input_files)
+        added = []
+        for path in file_paths:
+            if path not in existing:
+                existing.add(path)
+                added.append(path)
+        self.input_files.extend(added)
+        
+        # Update UI with a single relayout for the whole drop
+        self.file_list.setUpdatesEnabled(False)
+        self.file_list.addItems([self._index_file(path) for path in added])
+        self.file_list.setUpdatesEnabled(True)
         
         self.file_label.setText(f"{len(self.input_files)} file(s) selected")
         self.update_remove_button()
+        self.prefetch_video_info(added)
+
+    def _index_file(self, path):
+        """Register path in the basename index and return its list display name"""
+        name = os.path.basename(path)
+        if self._basename_index.get(name, path) != path:
+            # Same file name from another folder; show the folder to tell them apart
+            name = f"{name} ({os.path.dirname(path)})"
+        self._basename_index[name] = path
+        return name
+
+    def prefetch_video_info(self, file_paths):
+        """Fetch information for new files in the background so clicks don't wait on ffprobe"""
+        if not self._ffmpeg_available:
+            return
+            
+        for path in file_paths:
+            if self.known_video_info(path) is None:
+                self.info_pool.start(VideoInfoTask(path, self.info_signals))
+                
+    def video_info_ready(self, file_path, stat_key, info):
+        """Store background-fetched video information and show it if it was requested"""
+        if info and file_path in self.input_files:
+            self.video_info[file_path] = (stat_key, info)
+        if file_path == self.shown_info_path:
+            self.populate_video_info(info)
 
     def show_video_info(self, item):
         """Display information about the selected video file"""
         # Check if FFmpeg is installed
-        if not self._is_ffmpeg_installed():
+        if not self._ffmpeg_available:
             self.info_text.setHtml("<p style='color:red'>FFmpeg is not installed. Cannot retrieve video information.</p>")
             return
             
-        filename = item.text()
-        
         # Find the full file path
-        file_path = None
-        for path in self.input_files:
-            if os.path.basename(path) == filename:
-                file_path = path
-                break
-                
+        file_path = self._basename_index.get(item.text())
         if not file_path:
             return
             
-        # Get video information
-        info = VideoInfoExtractor.get_video_info(file_path)
+        self.shown_info_path = file_path
+        info = self.known_video_info(file_path)
+        if info:
+            self.populate_video_info(info)
+        else:
+            # Fetch it off the GUI thread, ahead of any queued prefetches;
+            # video_info_ready shows it unless another file was clicked meanwhile
+            self.info_text.setHtml("<i>Loading…</i>")
+            self.info_pool.start(VideoInfoTask(file_path, self.info_signals), 1)
+            
+    def known_video_info(self, file_path):
+        """Fetched information for file_path, or None if there is none or the file changed since"""
+        entry = self.video_info.get(file_path)
+        if entry is None:
+            return None
+        stat_key, info = entry
+        if stat_key != VideoInfoExtractor.stat_key(file_path):
+            del self.video_info[file_path]
+            return None
+        return info
         
+    def populate_video_info(self, info):
+        """Show video information in the info panel"""
         if not info:
             self.info_text.setText("Could not retrieve video information")
             return
             
         # Format and display the information
-        info_text = f"""
-        <b>File:</b> {info['filename']}
-        <b>Size:</b> {info['filesize']}
-        <b>Duration:</b> {info['duration']}
-        <b>Resolution:</b> {info['resolution']}
-        <b>Video Codec:</b> {info['video_codec']}
-        <b>Audio Codec:</b> {info['audio_codec']}
-        <b>Bitrate:</b> {info['bitrate']}
-        """
-        
-        self.info_text.setHtml(info_text)
+        self.info_text.setHtml(INFO_HTML.format_map(info))
 
     def show_conversion_logs(self):
         """Show detailed conversion logs in a dialog"""
-        if not self.last_conversion_output:
+        log_output = self.last_conversion_output
+        if self.last_conversion_log_path:
+            # Conversion logs are streamed to disk; read only the end when asked
+            try:
+                with open(self.last_conversion_log_path, "r", encoding="utf-8", errors="replace") as f:
+                    lines = collections.deque(f, maxlen=LOG_VIEW_LINES)
+                log_output = "".join(lines)
+                if len(lines) == LOG_VIEW_LINES:
+                    log_output = (
+                        f"(Showing the last {LOG_VIEW_LINES} lines, full log: "
+                        f"{self.last_conversion_log_path})\n\n" + log_output
+                    )
+            except OSError as e:
+                log_output = f"Could not read log file {self.last_conversion_log_path}: {str(e)}"
+                
+        if not log_output:
             QMessageBox.information(self, "Logs", "No conversion logs available.")
             return
             
@@ -1020,7 +1597,7 @@ class VideoConverterApp(QMainWindow):
         # Add text edit for logs
         log_text = QTextEdit()
         log_text.setReadOnly(True)
-        log_text.setPlainText(self.last_conversion_output)
+        log_text.setPlainText(log_output)
         log_text.setFont(QFont("Courier New", 9))  # Use monospace font
         layout.addWidget(log_text)
         
@@ -1033,61 +1610,15 @@ class VideoConverterApp(QMainWindow):
 
     def test_nvenc_manually(self):
         """Manually test NVENC functionality and display results to user"""
+        # A working NVENC stays working within a session, so show the earlier
+        # success; a failure is retested since the user may have fixed the cause
+        if self._nvenc_test_result is not None and self._nvenc_test_result[0]:
+            self.nvenc_test_completed(*self._nvenc_test_result)
+            return
+            
         self.status_label.setText("Testing NVENC hardware encoding...")
         self.test_nvenc_btn.setEnabled(False)
         
-        # Create a simple test thread
-        class NvencTestThread(QThread):
-            test_complete = pyqtSignal(bool, str)
-            
-            def run(self):
-                try:
-                    # Try much more lenient test parameters
-                    test_cmd = [
-                        "ffmpeg",
-                        "-hide_banner",
-                        "-y",
-                        "-f", "lavfi",
-                        "-i", "color=c=black:s=32x32:r=1:d=1",
-                        "-c:v", "h264_nvenc",  # Use NVENC
-                        "-gpu", "any",  # Try any GPU
-                        "-preset", "p1",  # Fastest preset
-                        "-profile:v", "baseline", # Simplest profile
-                        "-b:v", "100k",  # Very low bitrate
-                        "-t", "1",  # 1 second duration
-                        "-f", "null",
-                        "-"
-                    ]
-                    
-                    # Run the test
-                    result = subprocess.run(
-                        test_cmd,
-                        stdout=subprocess.PIPE, 
-                        stderr=subprocess.PIPE, 
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    # Collect results
-                    success = result.returncode == 0
-                    details = result.stderr if not success else "NVENC test successful!"
-                    
-                    # Check for specific error messages
-                    if not success:
-                        if "No NVENC capable devices found" in details:
-                            details = "No NVENC capable devices found. Your GPU may not support NVENC or drivers may be missing."
-                        elif "Generic error in an external library" in details:
-                            details = "Generic NVENC error. Try updating your NVIDIA drivers to the latest version."
-                        elif "Cannot load nvenc" in details:
-                            details = "Cannot load NVENC library. Ensure you have the latest NVIDIA drivers installed."
-                        elif "is not a NVENC capable device" in details:
-                            details = "Your GPU doesn't support NVENC encoding. Check GPU compatibility."
-                        
-                    self.test_complete.emit(success, details)
-                    
-                except Exception as e:
-                    self.test_complete.emit(False, f"Error testing NVENC: {str(e)}")
-        
         # Create and run the test thread
         self.nvenc_test_thread = NvencTestThread()
         self.nvenc_test_thread.test_complete.connect(self.nvenc_test_completed)
@@ -1096,6 +1627,8 @@ class VideoConverterApp(QMainWindow):
     def nvenc_test_completed(self, success, details):
         """Handle NVENC test results"""
         self.test_nvenc_btn.setEnabled(True)
+        self._nvenc_available = success
+        self._nvenc_test_result = (success, details)
         
         if success:
             self.status_label.setText("NVENC is working correctly.")
@@ -1125,8 +1658,24 @@ class VideoConverterApp(QMainWindow):
                 webbrowser.open("https://www.nvidia.com/Download/index.aspx")
                 
         # Save the test output for logs
-        self.last_conversion_output = details
+        self.set_conversion_log(details)
         self.view_logs_btn.setEnabled(True)
+    
+    def set_conversion_log(self, output, log_path=None):
+        """Replace the log shown by View Logs, deleting the previous log file"""
+        # Only the latest log can be viewed, so an older file would be orphaned
+        if self.last_conversion_log_path and self.last_conversion_log_path != log_path:
+            try:
+                os.remove(self.last_conversion_log_path)
+            except OSError:
+                pass
+        self.last_conversion_output = output
+        self.last_conversion_log_path = log_path
+    
+    def closeEvent(self, event):
+        # Remove the last failed conversion's log file
+        self.set_conversion_log("")
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)